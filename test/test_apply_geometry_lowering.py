@@ -0,0 +1,241 @@
+import random
+
+import pytest
+from utils import LagrangeElement
+
+import ufl.algorithms.apply_geometry_lowering as agl
+from ufl import (
+    CellDiameter,
+    CellVolume,
+    Circumradius,
+    Coefficient,
+    FacetArea,
+    FacetNormal,
+    FunctionSpace,
+    Jacobian,
+    JacobianDeterminant,
+    JacobianInverse,
+    Mesh,
+    SpatialCoordinate,
+    TestFunction,
+    TrialFunction,
+    as_tensor,
+    as_vector,
+    div,
+    ds,
+    dx,
+    grad,
+    hexahedron,
+    i,
+    j,
+    quadrilateral,
+    sqrt,
+    tetrahedron,
+    triangle,
+)
+from ufl.algorithms import compute_form_data
+from ufl.algorithms.apply_geometry_lowering import GeometryLoweringApplier, apply_geometry_lowering
+from ufl.algorithms.replace import replace
+from ufl.classes import (
+    CellCoordinate,
+    FacetJacobian,
+    FacetJacobianInverse,
+    FloatValue,
+    GeometricQuantity,
+    Index,
+    MaxValue,
+    ReferenceCellVolume,
+    ReferenceFacetVolume,
+    ReferenceGrad,
+    ReferenceNormal,
+)
+from ufl.corealg.map_dag import map_expr_dag
+from ufl.corealg.traversal import (
+    traverse_unique_terminals,
+    unique_post_traversal,
+    unique_pre_traversal,
+)
+from ufl.utils.sequences import product
+
+
+def test_geometry_lowering_shares_subtrees_between_integrals():
+    domain = Mesh(LagrangeElement(triangle, 1, (2,)))
+    K = JacobianInverse(domain)
+
+    a = apply_geometry_lowering(K[0, 0] * dx(1) + K[0, 0] * dx(2))
+    itg0, itg1 = a.integrals()
+    assert itg0.integrand() is itg1.integrand()
+
+
+def test_geometry_lowering_subclass_does_not_share_results():
+    class ScaledCoordinateApplier(GeometryLoweringApplier):
+        def spatial_coordinate(self, o):
+            return 2 * o
+
+    domain = Mesh(LagrangeElement(triangle, 1, (2,)))
+    J = Jacobian(domain)
+    lowered = apply_geometry_lowering(J)
+    assert map_expr_dag(ScaledCoordinateApplier(), J) != lowered
+    assert apply_geometry_lowering(J) == lowered
+
+
+def test_geometry_lowering_jacobian_inverse_shares_determinant():
+    domain = Mesh(LagrangeElement(triangle, 1, (2,)))
+    K = JacobianInverse(domain)
+    detJ = JacobianDeterminant(domain)
+
+    mf = GeometryLoweringApplier()
+    Klowered = map_expr_dag(mf, K)
+    detJlowered = map_expr_dag(mf, detJ)
+    assert any(e is detJlowered for e in unique_post_traversal(Klowered))
+
+    # A preserved determinant is not used in lowered quantities, which
+    # would then be differentiated through it
+    for quantity in (K, FacetNormal(domain)):
+        lowered = apply_geometry_lowering(quantity, preserve_types=(JacobianDeterminant,))
+        assert detJ not in traverse_unique_terminals(lowered)
+
+    domain = Mesh(LagrangeElement(quadrilateral, 1, (2,)))
+    V = FunctionSpace(domain, LagrangeElement(quadrilateral, 2))
+    u = TrialFunction(V)
+    v = TestFunction(V)
+    fd = compute_form_data(
+        div(grad(u)) * v * dx,
+        do_apply_function_pullbacks=True,
+        do_apply_geometry_lowering=True,
+        preserve_geometry_types=(JacobianDeterminant,),
+    )
+    for integral in fd.preprocessed_form.integrals():
+        for e in unique_post_traversal(integral.integrand()):
+            assert not (
+                isinstance(e, ReferenceGrad) and isinstance(e.ufl_operands[0], JacobianDeterminant)
+            )
+
+
+def test_geometry_lowering_edge_length_reduction_is_balanced():
+    def depth(e):
+        if not isinstance(e, MaxValue):
+            return 0
+        return 1 + max(depth(op) for op in e.ufl_operands)
+
+    domain = Mesh(LagrangeElement(hexahedron, 1, (3,)))
+    h = apply_geometry_lowering(CellDiameter(domain))
+    maxvalues = [e for e in unique_post_traversal(h) if isinstance(e, MaxValue)]
+    # Maximum over the 28 pairs of vertices
+    assert depth(maxvalues[-1]) == 5
+
+
+def test_geometry_lowering_fold_reference_volumes():
+    domain = Mesh(LagrangeElement(tetrahedron, 1, (3,)))
+    for quantity, r0, volume in (
+        (CellVolume(domain), ReferenceCellVolume(domain), 1.0 / 6.0),
+        (FacetArea(domain), ReferenceFacetVolume(domain), 1.0 / 2.0),
+    ):
+        assert r0 in traverse_unique_terminals(apply_geometry_lowering(quantity))
+
+        folded = apply_geometry_lowering(quantity, fold_reference_volumes=True)
+        terminals = set(traverse_unique_terminals(folded))
+        assert r0 not in terminals
+        assert FloatValue(volume) in terminals
+
+
+def _evaluate_geometry(e):
+    """Evaluate e with pseudo-random values for the geometry, seeded by the quantities."""
+    mapping = {}
+    for o in unique_pre_traversal(e):
+        if isinstance(o, ReferenceGrad | GeometricQuantity) and o not in mapping:
+            rng = random.Random(str(o))
+            values = [rng.uniform(0.5, 1.5) for _ in range(product(o.ufl_shape))]
+            mapping[o] = as_tensor(_nested(values, o.ufl_shape)) if o.ufl_shape else values[0]
+    return float(replace(e, mapping))
+
+
+def _nested(values, shape):
+    """Arrange a flat list of values in nested lists of the given shape."""
+    if len(shape) == 1:
+        return values
+    n = len(values) // shape[0]
+    return [_nested(values[k * n : (k + 1) * n], shape[1:]) for k in range(shape[0])]
+
+
+def test_geometry_lowering_reuses_indices(monkeypatch):
+    # Bound indices are shared between lowered quantities, so lowering
+    # is deterministic
+    domain = Mesh(LagrangeElement(tetrahedron, 1, (3,)))
+    h = Circumradius(domain)
+    assert apply_geometry_lowering(h) == apply_geometry_lowering(h)
+
+    def lower_with_fresh_indices(quantity):
+        monkeypatch.setattr(agl, "_i", Index())
+        monkeypatch.setattr(agl, "_j", Index())
+        monkeypatch.setattr(agl, "_k", Index())
+        r = apply_geometry_lowering(quantity)
+        monkeypatch.undo()
+        return r
+
+    # Contracting lowered quantities with one another gives the same
+    # values as lowering each of them with its own bound indices
+    for cell, gdim in ((tetrahedron, 3), (triangle, 2), (triangle, 3)):
+        domain = Mesh(LagrangeElement(cell, 1, (gdim,)))
+        quantities = (
+            FacetNormal(domain),
+            FacetJacobian(domain),
+            FacetJacobianInverse(domain),
+            CellCoordinate(domain),
+            SpatialCoordinate(domain),
+        )
+        contractions = [
+            lambda n, FJ, FK, X, x: n[i] * FJ[i, 0],
+            lambda n, FJ, FK, X, x: FK[0, i] * n[i] + FK[0, i] * FJ[i, 0],
+            lambda n, FJ, FK, X, x: X[0] * n[i] * x[i] * n[j] * n[j],
+        ]
+        if gdim == cell.topological_dimension:
+            contractions.append(lambda n, FJ, FK, X, x: X[i] * n[i] * X[j] * FJ[j, 0])
+
+        for contraction in contractions:
+            pooled = apply_geometry_lowering(contraction(*quantities))
+            fresh = contraction(*(lower_with_fresh_indices(q) for q in quantities))
+            assert _evaluate_geometry(pooled) == pytest.approx(_evaluate_geometry(fresh))
+
+
+def test_geometry_lowering_reuses_untouched_forms():
+    domain = Mesh(LagrangeElement(triangle, 1, (2,)))
+    f = Coefficient(FunctionSpace(domain, LagrangeElement(triangle, 1)))
+
+    a = f * dx + f**2 * ds
+    assert apply_geometry_lowering(a) is a
+    (integral,) = a.integrals_by_type("cell")
+    assert apply_geometry_lowering(integral) is integral
+
+    b = f * dx + f * JacobianDeterminant(domain) * ds
+    lowered = apply_geometry_lowering(b)
+    assert lowered is not b
+    assert lowered.integrals_by_type("cell") == b.integrals_by_type("cell")
+
+
+def test_geometry_lowering_facet_normal_square_jacobian():
+    for cell in (triangle, quadrilateral, tetrahedron, hexahedron):
+        tdim = cell.topological_dimension
+        domain = Mesh(LagrangeElement(cell, 1, (tdim,)))
+        n = apply_geometry_lowering(FacetNormal(domain))
+        assert n.ufl_shape == (tdim,)
+
+        # Compare with indexing the lowered inverse Jacobian
+        K = apply_geometry_lowering(JacobianInverse(domain))
+        rn = ReferenceNormal(domain)
+        ndir = as_vector(K[j, i] * rn[j], i)
+        reference = ndir / sqrt(ndir[i] * ndir[i])
+
+        def num_nodes(e):
+            return sum(1 for _ in unique_post_traversal(e))
+
+        assert num_nodes(n) < num_nodes(reference)
+
+
+def test_geometry_lowering_preserves_types_in_lowered_quantities():
+    domain = Mesh(LagrangeElement(triangle, 1, (2,)))
+    J = Jacobian(domain)
+    for quantity in (JacobianInverse(domain), CellVolume(domain), FacetNormal(domain)):
+        lowered = apply_geometry_lowering(quantity, preserve_types=(Jacobian,))
+        assert J in traverse_unique_terminals(lowered)
+        assert apply_geometry_lowering(J, preserve_types=(Jacobian,)) is J
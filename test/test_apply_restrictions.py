@@ -12,8 +12,9 @@ from ufl import (
     i,
     triangle,
 )
-from ufl.algorithms.apply_restrictions import apply_restrictions
+from ufl.algorithms.apply_restrictions import RestrictionPropagator, apply_restrictions
 from ufl.algorithms.renumbering import renumber_indices
+from ufl.corealg.map_dag import map_expr_dag
 from ufl.pullback import identity_pullback
 from ufl.sobolevspace import L2
 
@@ -71,3 +72,48 @@ def test_apply_restrictions():
     # This would be nicer, but -f is translated to -1*f which is
     # translated to as_tensor(-1*f[i], i). assert
     # apply_restrictions(n('-'), default_restrictions={domain: '+'}) == -n('+')
+
+
+def test_apply_restrictions_without_default_restrictions():
+    cell = triangle
+    V0 = FiniteElement("Discontinuous Lagrange", cell, 0, (), identity_pullback, L2)
+    V1 = LagrangeElement(cell, 1)
+
+    domain = Mesh(LagrangeElement(cell, 1, (2,)))
+    f0 = Coefficient(FunctionSpace(domain, V0))
+    f = Coefficient(FunctionSpace(domain, V1))
+    n = FacetNormal(domain)
+
+    # Unrestricted quantities are left alone
+    e = f0 * grad(f)[0]
+    assert apply_restrictions(e) is e
+
+    # Restrictions are only propagated to terminals
+    assert apply_restrictions((f0 * f)("-")) == f0("-") * f("-")
+    assert apply_restrictions((grad(f) ** 2)("+")) == grad(f)("+") ** 2
+    assert apply_restrictions(n("-")) == n("-")
+
+
+def test_restriction_propagator_creates_side_propagators_on_demand():
+    domain = Mesh(LagrangeElement(triangle, 1, (2,)))
+    f = Coefficient(FunctionSpace(domain, LagrangeElement(triangle, 1)))
+
+    rules = RestrictionPropagator(default_restrictions={domain: "+"})
+    assert map_expr_dag(rules, (f * f)("+")) == f("+") * f("+")
+    assert set(rules._rp) == {"+"}
+
+
+def test_restriction_propagator_subclass_rules_without_default_restrictions():
+    class DefaultPlusPropagator(RestrictionPropagator):
+        def _default_restricted(self, o):
+            return o(self.current_restriction or "+")
+
+    domain = Mesh(LagrangeElement(triangle, 1, (2,)))
+    f = Coefficient(FunctionSpace(domain, LagrangeElement(triangle, 1)))
+
+    # The coefficient rule calls the overridden rule, while handlers
+    # bound to the generic rule keep its behaviour
+    x = SpatialCoordinate(domain)
+    rules = DefaultPlusPropagator()
+    assert map_expr_dag(rules, f) == f("+")
+    assert map_expr_dag(rules, x) == x
@@ -11,7 +11,6 @@ of mostly the Jacobian and reference cell data.
 # SPDX-License-Identifier:    LGPL-3.0-or-later
 
 import warnings
-from functools import reduce
 from itertools import combinations
 
 from ufl.classes import (
@@ -41,26 +40,84 @@ from ufl.classes import (
     RidgeJacobian,
     SpatialCoordinate,
 )
-from ufl.compound_expressions import cross_expr, determinant_expr, inverse_expr
-from ufl.core.multiindex import Index, indices
+from ufl.compound_expressions import adj_expr, cross_expr, determinant_expr, inverse_expr
+from ufl.core.multiindex import indices
 from ufl.corealg.map_dag import map_expr_dag
 from ufl.corealg.multifunction import MultiFunction, memoized_handler
-from ufl.domain import extract_unique_domain
 from ufl.measure import custom_integral_types, point_integral_types
 from ufl.operators import conj, max_value, min_value, real, sqrt
 from ufl.tensors import as_tensor, as_vector
 
+# Indices for the tensor expressions built by the handlers. These are
+# always bound within the expression built, so the same indices can be
+# used in all of them instead of creating new ones on each call.
+_i, _j, _k = indices(3)
+
+# Volumes of the reference simplices and of their facets, in the UFC
+# convention of reference cells with vertices at 0 and the unit vectors
+_reference_cell_volumes = {"interval": 1.0, "triangle": 1.0 / 2.0, "tetrahedron": 1.0 / 6.0}
+_reference_facet_volumes = {"triangle": 1.0, "tetrahedron": 1.0 / 2.0}
+
+
+def _tree_reduce(op, operands):
+    """Reduce operands pairwise with the associative op, giving a balanced expression tree."""
+    operands = list(operands)
+    while len(operands) > 1:
+        reduced = [op(a, b) for a, b in zip(operands[::2], operands[1::2])]
+        if len(operands) % 2:
+            reduced.append(operands[-1])
+        operands = reduced
+    return operands[0]
+
 
 class GeometryLoweringApplier(MultiFunction):
     """Geometry lowering."""
 
-    def __init__(self, preserve_types=()):
+    def __init__(self, preserve_types=(), fold_reference_volumes=False):
         """Initialise."""
         MultiFunction.__init__(self)
-        # Store preserve_types as boolean lookup table
-        self._preserve_types = [False] * Expr._ufl_num_typecodes_
-        for cls in preserve_types:
-            self._preserve_types[cls._ufl_typecode_] = True
+        # Store preserve_types as set of typecodes
+        self._preserve_types = frozenset(cls._ufl_typecode_ for cls in preserve_types)
+        # Dispatch preserved types to the terminal rule, such that the
+        # handlers themselves need not check for preserved types
+        for tc in self._preserve_types:
+            self._handlers[tc] = self.terminal
+        self._fold_reference_volumes = fold_reference_volumes
+        # Cache for domain properties which are invariant but not free
+        # to compute
+        self._affine_simplex_cache = {}
+        # Cache of the quantities constructed to lower other quantities
+        self._quantity_cache = {}
+
+    def _domain_of(self, o):
+        """Get the unique domain of a geometric quantity."""
+        # Read the domain directly instead of traversing o with
+        # extract_unique_domain; a geometric quantity is defined on a
+        # single mesh
+        (domain,) = o.ufl_domains()
+        return domain
+
+    def _quantity(self, cls, domain):
+        """Get a geometric quantity on a domain, reusing previously constructed objects."""
+        key = (cls, domain)
+        q = self._quantity_cache.get(key)
+        if q is None:
+            q = cls(domain)
+            self._quantity_cache[key] = q
+        return q
+
+    def _lowered(self, cls, domain):
+        """Get a geometric quantity on a domain, lowered unless it is preserved."""
+        q = self._quantity(cls, domain)
+        return self._handlers[q._ufl_typecode_](q)
+
+    def _is_piecewise_linear_simplex_domain(self, domain):
+        """Check if the domain is a piecewise linear simplex, reusing previous checks."""
+        r = self._affine_simplex_cache.get(domain)
+        if r is None:
+            r = domain.is_piecewise_linear_simplex_domain()
+            self._affine_simplex_cache[domain] = r
+        return r
 
     expr = MultiFunction.reuse_if_untouched
 
@@ -71,16 +128,14 @@ class GeometryLoweringApplier(MultiFunction):
     @memoized_handler
     def jacobian(self, o):
         """Apply to jacobian."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-        domain = extract_unique_domain(o)
+        domain = self._domain_of(o)
         if not domain.ufl_coordinate_element().pullback.is_identity:
             raise ValueError("Piola mapped coordinates are not implemented.")
         # Note: No longer supporting domain.coordinates(), always
         # preserving SpatialCoordinate object.  However if Jacobians
         # are not preserved, using
         # ReferenceGrad(SpatialCoordinate(domain)) to represent them.
-        x = self.spatial_coordinate(SpatialCoordinate(domain))
+        x = self._lowered(SpatialCoordinate, domain)
         return ReferenceGrad(x)
 
     @memoized_handler
@@ -95,24 +150,26 @@ class GeometryLoweringApplier(MultiFunction):
     @memoized_handler
     def jacobian_inverse(self, o):
         """Apply to jacobian_inverse."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        J = self.jacobian(Jacobian(domain))
-        # TODO: This could in principle use
-        # preserve_types[JacobianDeterminant] with minor refactoring:
-        K = inverse_expr(J)
+        domain = self._domain_of(o)
+        J = self._lowered(Jacobian, domain)
+        m, n = J.ufl_shape
+        if m == n and n > 1:
+            # Closed form adjugate over the lowered determinant, such
+            # that the determinant subtree is shared with
+            # JacobianDeterminant. The determinant is lowered even if
+            # JacobianDeterminant is preserved, as the inverse would
+            # otherwise be differentiated through the preserved terminal
+            detJ = self.jacobian_determinant(self._quantity(JacobianDeterminant, domain))
+            K = adj_expr(J) / detJ
+        else:
+            K = inverse_expr(J)
         return K
 
     @memoized_handler
     def jacobian_determinant(self, o):
         """Apply to jacobian_determinant."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        J = self.jacobian(Jacobian(domain))
+        domain = self._domain_of(o)
+        J = self._lowered(Jacobian, domain)
         detJ = determinant_expr(J)
 
         # TODO: Is "signing" the determinant for manifolds the
@@ -126,23 +183,17 @@ class GeometryLoweringApplier(MultiFunction):
     @memoized_handler
     def facet_jacobian(self, o):
         """Apply to facet_jacobian."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        J = self.jacobian(Jacobian(domain))
+        domain = self._domain_of(o)
+        J = self._lowered(Jacobian, domain)
         RFJ = CellFacetJacobian(domain)
-        i, j, k = indices(3)
+        i, j, k = _i, _j, _k
         return as_tensor(J[i, k] * RFJ[k, j], (i, j))
 
     @memoized_handler
     def facet_jacobian_inverse(self, o):
         """Apply to facet_jacobian_inverse."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        FJ = self.facet_jacobian(FacetJacobian(domain))
+        domain = self._domain_of(o)
+        FJ = self._lowered(FacetJacobian, domain)
         # This could in principle use
         # preserve_types[JacobianDeterminant] with minor refactoring:
         return inverse_expr(FJ)
@@ -150,11 +201,8 @@ class GeometryLoweringApplier(MultiFunction):
     @memoized_handler
     def facet_jacobian_determinant(self, o):
         """Apply to facet_jacobian_determinant."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        FJ = self.facet_jacobian(FacetJacobian(domain))
+        domain = self._domain_of(o)
+        FJ = self._lowered(FacetJacobian, domain)
         detFJ = determinant_expr(FJ)
 
         # TODO: Should we "sign" the facet jacobian determinant for
@@ -169,33 +217,24 @@ class GeometryLoweringApplier(MultiFunction):
     @memoized_handler
     def ridge_jacobian(self, o):
         """Apply to ridge_jacobian."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        J = self.jacobian(Jacobian(domain))
+        domain = self._domain_of(o)
+        J = self._lowered(Jacobian, domain)
         REJ = CellRidgeJacobian(domain)
-        i, j, k = indices(3)
+        i, j, k = _i, _j, _k
         return as_tensor(J[i, k] * REJ[k, j], (i, j))
 
     @memoized_handler
     def ridge_jacobian_inverse(self, o):
         """Apply to edge_jacobian_inverse."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        EJ = self.ridge_jacobian(RidgeJacobian(domain))
+        domain = self._domain_of(o)
+        EJ = self._lowered(RidgeJacobian, domain)
         return inverse_expr(EJ)
 
     @memoized_handler
     def ridge_jacobian_determinant(self, o):
         """Apply to edge_jacobian_determinant."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        EJ = self.ridge_jacobian(RidgeJacobian(domain))
+        domain = self._domain_of(o)
+        EJ = self._lowered(RidgeJacobian, domain)
         detEJ = determinant_expr(EJ)
         return detEJ
 
@@ -205,9 +244,7 @@ class GeometryLoweringApplier(MultiFunction):
 
         Fall through to coordinate field of domain if it exists.
         """
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-        if not extract_unique_domain(o).ufl_coordinate_element().pullback.is_identity:
+        if not self._domain_of(o).ufl_coordinate_element().pullback.is_identity:
             raise ValueError("Piola mapped coordinates are not implemented.")
         # No longer supporting domain.coordinates(), always preserving
         # SpatialCoordinate object.
@@ -219,23 +256,17 @@ class GeometryLoweringApplier(MultiFunction):
 
         Compute from physical coordinates if they are known, using the appropriate mappings.
         """
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        K = self.jacobian_inverse(JacobianInverse(domain))
-        x = self.spatial_coordinate(SpatialCoordinate(domain))
+        domain = self._domain_of(o)
+        K = self._lowered(JacobianInverse, domain)
+        x = self._lowered(SpatialCoordinate, domain)
         x0 = CellOrigin(domain)
-        i, j = indices(2)
+        i, j = _i, _j
         X = as_tensor(K[i, j] * (x[j] - x0[j]), (i,))
         return X
 
     @memoized_handler
     def facet_cell_coordinate(self, o):
         """Apply to facet_cell_coordinate."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
         raise ValueError(
             "Missing computation of facet reference coordinates "
             "from physical coordinates via mappings."
@@ -244,29 +275,26 @@ class GeometryLoweringApplier(MultiFunction):
     @memoized_handler
     def cell_volume(self, o):
         """Apply to cell_volume."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
-        if not domain.is_piecewise_linear_simplex_domain():
+        domain = self._domain_of(o)
+        if not self._is_piecewise_linear_simplex_domain(domain):
             # Don't lower for non-affine cells, instead leave it to
             # form compiler
             warnings.warn("Only know how to compute the cell volume of an affine cell.")
             return o
 
-        r = self.jacobian_determinant(JacobianDeterminant(domain))
-        r0 = ReferenceCellVolume(domain)
+        r = self._lowered(JacobianDeterminant, domain)
+        if self._fold_reference_volumes:
+            r0 = FloatValue(_reference_cell_volumes[domain.ufl_cell().cellname])
+        else:
+            r0 = ReferenceCellVolume(domain)
         return abs(r * r0)
 
     @memoized_handler
     def facet_area(self, o):
         """Apply to facet_area."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
+        domain = self._domain_of(o)
         tdim = domain.topological_dimension
-        if not domain.is_piecewise_linear_simplex_domain():
+        if not self._is_piecewise_linear_simplex_domain(domain):
             # Don't lower for non-affine cells, instead leave it to
             # form compiler
             warnings.warn("Only know how to compute the facet area of an affine cell.")
@@ -276,23 +304,23 @@ class GeometryLoweringApplier(MultiFunction):
         if tdim == 1:
             return FloatValue(1.0)
 
-        r = self.facet_jacobian_determinant(FacetJacobianDeterminant(domain))
-        r0 = ReferenceFacetVolume(domain)
+        r = self._lowered(FacetJacobianDeterminant, domain)
+        if self._fold_reference_volumes:
+            r0 = FloatValue(_reference_facet_volumes[domain.ufl_cell().cellname])
+        else:
+            r0 = ReferenceFacetVolume(domain)
         return abs(r * r0)
 
     @memoized_handler
     def circumradius(self, o):
         """Apply to circumradius."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
+        domain = self._domain_of(o)
 
-        domain = extract_unique_domain(o)
-
-        if not domain.is_piecewise_linear_simplex_domain():
+        if not self._is_piecewise_linear_simplex_domain(domain):
             raise ValueError("Circumradius only makes sense for affine simplex cells")
 
         cellname = domain.ufl_cell().cellname
-        cellvolume = self.cell_volume(CellVolume(domain))
+        cellvolume = self._lowered(CellVolume, domain)
 
         if cellname == "interval":
             # Optimization for square interval; no square root needed
@@ -301,11 +329,14 @@ class GeometryLoweringApplier(MultiFunction):
         # Compute lengths of cell edges
         edges = CellEdgeVectors(domain)
         num_edges = edges.ufl_shape[0]
-        j = Index()
-        elen = [real(sqrt(real(edges[e, j] * conj(edges[e, j])))) for e in range(num_edges)]
+        j = _j
+        elen2 = [real(edges[e, j] * conj(edges[e, j])) for e in range(num_edges)]
+        elen = [sqrt(e2) for e2 in elen2]
 
         if cellname == "triangle":
-            return (elen[0] * elen[1] * elen[2]) / (4.0 * cellvolume)
+            # Mark the product of edge lengths as real once, rather
+            # than each of the edge lengths
+            return real(elen[0] * elen[1] * elen[2]) / (4.0 * cellvolume)
 
         elif cellname == "tetrahedron":
             # la, lb, lc = lengths of the sides of an intermediate triangle
@@ -333,10 +364,7 @@ class GeometryLoweringApplier(MultiFunction):
 
     def _reduce_cell_edge_length(self, o, reduction_op):
         """Apply to _reduce_cell_edge_length."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
+        domain = self._domain_of(o)
 
         if domain.ufl_coordinate_element().embedded_subdegree > 1:
             # Don't lower bendy cells, instead leave it to form compiler
@@ -345,40 +373,40 @@ class GeometryLoweringApplier(MultiFunction):
 
         elif domain.ufl_cell().cellname == "interval":
             # Interval optimization, square root not needed
-            return self.cell_volume(CellVolume(domain))
+            return self._lowered(CellVolume, domain)
 
         else:
             # Other P1 or Q1 cells
             edges = CellEdgeVectors(domain)
             num_edges = edges.ufl_shape[0]
-            j = Index()
+            j = _j
             elen2 = [real(edges[e, j] * conj(edges[e, j])) for e in range(num_edges)]
-            return real(sqrt(reduce(reduction_op, elen2)))
+            return real(sqrt(_tree_reduce(reduction_op, elen2)))
 
     @memoized_handler
     def cell_diameter(self, o):
         """Apply to cell_diameter."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
+        domain = self._domain_of(o)
 
         if domain.ufl_coordinate_element().embedded_subdegree > 1:
             # Don't lower bendy cells, instead leave it to form compiler
             warnings.warn("Only know how to compute cell diameter of P1 or Q1 cell.")
             return o
 
-        elif domain.is_piecewise_linear_simplex_domain():
+        elif self._is_piecewise_linear_simplex_domain(domain):
             # Simplices
-            return self.max_cell_edge_length(MaxCellEdgeLength(domain))
+            return self._lowered(MaxCellEdgeLength, domain)
 
         else:
             # Q1 cells, maximal distance between any two vertices
             verts = CellVertices(domain)
             verts = [verts[v, ...] for v in range(verts.ufl_shape[0])]
-            j = Index()
-            elen2 = (real((v0 - v1)[j] * conj((v0 - v1)[j])) for v0, v1 in combinations(verts, 2))
-            return real(sqrt(reduce(max_value, elen2)))
+            j = _j
+            elen2 = []
+            for v0, v1 in combinations(verts, 2):
+                d = v0 - v1
+                elen2.append(real(d[j] * conj(d[j])))
+            return real(sqrt(_tree_reduce(max_value, elen2)))
 
     @memoized_handler
     def max_facet_edge_length(self, o):
@@ -392,10 +420,7 @@ class GeometryLoweringApplier(MultiFunction):
 
     def _reduce_facet_edge_length(self, o, reduction_op):
         """Apply to _reduce_facet_edge_length."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
+        domain = self._domain_of(o)
 
         if domain.ufl_cell().topological_dimension < 3:
             raise ValueError("Facet edge lengths only make sense for topological dimension >= 3.")
@@ -409,23 +434,20 @@ class GeometryLoweringApplier(MultiFunction):
             # P1 tetrahedron or Q1 hexahedron
             edges = FacetEdgeVectors(domain)
             num_edges = edges.ufl_shape[0]
-            j = Index()
+            j = _j
             elen2 = [real(edges[e, j] * conj(edges[e, j])) for e in range(num_edges)]
-            return real(sqrt(reduce(reduction_op, elen2)))
+            return real(sqrt(_tree_reduce(reduction_op, elen2)))
 
     @memoized_handler
     def cell_normal(self, o):
         """Apply to cell_normal."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
+        domain = self._domain_of(o)
         gdim = domain.geometric_dimension
         tdim = domain.topological_dimension
 
         if tdim == gdim - 1:  # n-manifold embedded in n-1 space
-            i = Index()
-            J = self.jacobian(Jacobian(domain))
+            i = _i
+            J = self._lowered(Jacobian, domain)
 
             if tdim == 2:
                 # Surface in 3D
@@ -449,23 +471,20 @@ class GeometryLoweringApplier(MultiFunction):
     @memoized_handler
     def facet_normal(self, o):
         """Apply to facet_normal."""
-        if self._preserve_types[o._ufl_typecode_]:
-            return o
-
-        domain = extract_unique_domain(o)
+        domain = self._domain_of(o)
         tdim = domain.topological_dimension
+        gdim = domain.geometric_dimension
 
         if tdim == 1:
             # Special-case 1D (possibly immersed), for which we say
             # that n is just in the direction of J.
-            J = self.jacobian(Jacobian(domain))  # dx/dX
+            J = self._lowered(Jacobian, domain)  # dx/dX
             ndir = J[:, 0]
 
-            gdim = domain.geometric_dimension
             if gdim == 1:
                 nlen = abs(ndir[0])
             else:
-                i = Index()
+                i = _i
                 nlen = sqrt(ndir[i] * ndir[i])
 
             rn = ReferenceNormal(domain)  # +/- 1.0 here
@@ -476,15 +495,24 @@ class GeometryLoweringApplier(MultiFunction):
             # preserves tangential components. The normal vector is
             # characterised by having zero tangential component in
             # reference and physical space.
-            Jinv = self.jacobian_inverse(JacobianInverse(domain))
-            i, j = indices(2)
-
             rn = ReferenceNormal(domain)
+            i, j = _i, _j
+
             # compute signed, unnormalised normal; note transpose
-            ndir = as_vector(Jinv[j, i] * rn[j], i)
+            if tdim == gdim and JacobianInverse._ufl_typecode_ not in self._preserve_types:
+                # For a square Jacobian, contract with the adjugate and
+                # divide by the determinant in the same component
+                # expression, instead of indexing the component tensor
+                # of the lowered inverse. As in jacobian_inverse, the
+                # determinant is lowered even if it is preserved
+                J = self._lowered(Jacobian, domain)
+                detJ = self.jacobian_determinant(self._quantity(JacobianDeterminant, domain))
+                ndir = as_vector(adj_expr(J)[j, i] * rn[j] / detJ, i)
+            else:
+                Jinv = self._lowered(JacobianInverse, domain)
+                ndir = as_vector(Jinv[j, i] * rn[j], i)
 
             # normalise
-            i = Index()
             n = ndir / sqrt(ndir[i] * ndir[i])
             r = n
 
@@ -495,7 +523,16 @@ class GeometryLoweringApplier(MultiFunction):
         return r
 
 
-def apply_geometry_lowering(form, preserve_types=()):
+def _integral_preserve_types(integral, preserve_types):
+    """Get the types to preserve when lowering the geometry of an integral."""
+    if integral.integral_type() in (custom_integral_types + point_integral_types):
+        automatic_preserve_types = [SpatialCoordinate, Jacobian]
+    else:
+        automatic_preserve_types = [CellCoordinate]
+    return frozenset(preserve_types) | frozenset(automatic_preserve_types)
+
+
+def apply_geometry_lowering(form, preserve_types=(), fold_reference_volumes=False):
     """Change GeometricQuantity objects in expression to the lowest level GeometricQuantity objects.
 
     Assumes the expression is preprocessed or at least that derivatives have been expanded.
@@ -503,28 +540,50 @@ def apply_geometry_lowering(form, preserve_types=()):
     Args:
         form: An Expr or Form.
         preserve_types: Preserved types
+        fold_reference_volumes: If True, replace the reference cell and
+            facet volumes of simplices in lowered cell volumes and facet
+            areas by their values for UFC reference cells. Only use this
+            if the form compiler uses the same reference cells.
     """
     if isinstance(form, Form):
-        newintegrals = [
-            apply_geometry_lowering(integral, preserve_types) for integral in form.integrals()
-        ]
+        # Share the applier and the map_expr_dag caches between
+        # integrals preserving the same types, such that subtrees
+        # common to several integrals are only lowered once
+        appliers = {}
+        newintegrals = []
+        changed = False
+        for integral in form.integrals():
+            integral_preserve_types = _integral_preserve_types(integral, preserve_types)
+            if integral_preserve_types not in appliers:
+                appliers[integral_preserve_types] = (
+                    GeometryLoweringApplier(integral_preserve_types, fold_reference_volumes),
+                    {},
+                    {},
+                )
+            mf, vcache, rcache = appliers[integral_preserve_types]
+            newintegrand = map_expr_dag(mf, integral.integrand(), vcache=vcache, rcache=rcache)
+            if newintegrand is not integral.integrand():
+                integral = integral.reconstruct(integrand=newintegrand)
+                changed = True
+            newintegrals.append(integral)
+        # Reuse the form if no integral was touched
+        if not changed:
+            return form
         return Form(newintegrals)
 
     elif isinstance(form, Integral):
         integral = form
-        if integral.integral_type() in (custom_integral_types + point_integral_types):
-            automatic_preserve_types = [SpatialCoordinate, Jacobian]
-        else:
-            automatic_preserve_types = [CellCoordinate]
-        preserve_types = set(preserve_types) | set(automatic_preserve_types)
-
-        mf = GeometryLoweringApplier(preserve_types)
+        mf = GeometryLoweringApplier(
+            _integral_preserve_types(integral, preserve_types), fold_reference_volumes
+        )
         newintegrand = map_expr_dag(mf, integral.integrand())
+        if newintegrand is integral.integrand():
+            return integral
         return integral.reconstruct(integrand=newintegrand)
 
     elif isinstance(form, Expr):
         expr = form
-        mf = GeometryLoweringApplier(preserve_types)
+        mf = GeometryLoweringApplier(preserve_types, fold_reference_volumes)
         return map_expr_dag(mf, expr)
 
     else:
@@ -14,10 +14,11 @@ from __future__ import annotations
 
 from typing import Literal
 
-from ufl.algorithms.map_integrands import map_integrand_dags
-from ufl.classes import Expr, Restricted
+from ufl.algorithms.map_integrands import map_integrand_dags, map_integrands
+from ufl.classes import Expr, Restricted, Variable
 from ufl.corealg.map_dag import map_expr_dag
 from ufl.corealg.multifunction import MultiFunction
+from ufl.corealg.traversal import unique_pre_traversal
 from ufl.domain import Mesh, extract_unique_domain
 from ufl.sobolevspace import H1
 
@@ -54,11 +55,32 @@ class RestrictionPropagator(MultiFunction):
         # Caches for propagating the restriction with map_expr_dag
         self.vcaches: dict[Literal["+", "-"], dict] = {"+": {}, "-": {}}
         self.rcaches: dict[Literal["+", "-"], dict] = {"+": {}, "-": {}}
-        if self.current_restriction is None:
-            self._rp = {
-                "+": RestrictionPropagator("+", default_restrictions),
-                "-": RestrictionPropagator("-", default_restrictions),
-            }
+        # Propagators for the restricted subtrees, created on first use
+        # as many forms only restrict to one side
+        self._rp: dict[Literal["+", "-"], RestrictionPropagator] = {}
+        if default_restrictions is None:
+            # Without default restrictions all restriction rules reduce
+            # to propagating the current restriction, so dispatch
+            # directly to a rule specialized for this side
+            if side is None:
+
+                def propagate(o):
+                    return o
+            else:
+
+                def propagate(o):
+                    return o(side)
+
+            generic_rules = ("_require_restriction", "_default_restricted", "_opposite")
+            generic = tuple(getattr(RestrictionPropagator, name) for name in generic_rules)
+            self._handlers = [
+                propagate if getattr(h, "__func__", None) in generic else h for h in self._handlers
+            ]
+            # Rules called from other handlers are only replaced if a
+            # subclass does not override them
+            for name in generic_rules:
+                if getattr(type(self), name) is getattr(RestrictionPropagator, name):
+                    setattr(self, name, propagate)
 
     def restricted(self, o):
         """When hitting a restricted quantity, visit child with a separate restriction algorithm."""
@@ -68,8 +90,11 @@ class RestrictionPropagator(MultiFunction):
             raise ValueError("Cannot restrict an expression twice.")
         # Configure a propagator for this side and apply to subtree
         side = o.side()
+        rp = self._rp.get(side)
+        if rp is None:
+            rp = self._rp[side] = RestrictionPropagator(side, self.default_restrictions)
         return map_expr_dag(
-            self._rp[side], o.ufl_operands[0], vcache=self.vcaches[side], rcache=self.rcaches[side]
+            rp, o.ufl_operands[0], vcache=self.vcaches[side], rcache=self.rcaches[side]
         )
 
     # --- Reusable rules
@@ -208,7 +233,9 @@ class RestrictionPropagator(MultiFunction):
         """Reference value of something follows same restriction rule as the underlying object."""
         (f,) = o.ufl_operands
         assert f._ufl_is_terminal_
-        g = self(f)
+        # Terminal handlers take no operands, so look up the handler
+        # directly instead of going through __call__
+        g = self._handlers[f._ufl_typecode_](f)
         if isinstance(g, Restricted):
             side = g.side()
             return o(side)
@@ -307,4 +334,27 @@ def apply_restrictions(expression: Expr, default_restrictions: dict | None = Non
 
     """
     rules = RestrictionPropagator(default_restrictions=default_restrictions)
+    if default_restrictions is None:
+        # Only visit the integrands the propagator may change
+        def propagate(integrand):
+            if _requires_propagation(rules, integrand):
+                return map_expr_dag(rules, integrand)
+            return integrand
+
+        return map_integrands(propagate, expression)
     return map_integrand_dags(rules, expression)
+
+
+def _requires_propagation(rules: RestrictionPropagator, expression: Expr) -> bool:
+    """Check whether propagating restrictions without default restrictions may change expression.
+
+    Without default restrictions the propagator returns unrestricted
+    quantities unchanged, so it only changes expressions containing
+    restrictions or variables, or raises for terminals without a rule.
+    """
+    for o in unique_pre_traversal(expression):
+        if isinstance(o, Restricted | Variable):
+            return True
+        if o._ufl_is_terminal_ and rules._handlers[o._ufl_typecode_] == rules._missing_rule:
+            return True
+    return False
@@ -108,22 +108,18 @@ def map_expr_dags(function, expressions, compress=True, vcache=None, rcache=None
                 continue
 
             # Cache miss: Get transformed operands, then apply transformation
-            if cutoff_types[v._ufl_typecode_]:
-                r = handlers[v._ufl_typecode_](v)
+            tc = v._ufl_typecode_
+            if cutoff_types[tc]:
+                r = handlers[tc](v)
             else:
-                r = handlers[v._ufl_typecode_](v, *(vcache[u] for u in v.ufl_operands))
+                r = handlers[tc](v, *[vcache[u] for u in v.ufl_operands])
 
             # Optionally check if r is in rcache, a memory optimization
-            # to be able to keep representation of result compact
+            # to be able to keep representation of result compact. On a
+            # cache hit, use the previously computed object, allowing r
+            # to be garbage collected as soon as possible
             if compress:
-                r2 = rcache.get(r)
-                if r2 is None:
-                    # Cache miss: store in rcache
-                    rcache[r] = r
-                else:
-                    # Cache hit: Use previously computed object r2,
-                    # allowing r to be garbage collected as soon as possible
-                    r = r2
+                r = rcache.setdefault(r, r)
 
             # Store result in cache
             vcache[v] = r
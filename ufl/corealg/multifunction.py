@@ -108,10 +108,10 @@ class MultiFunction:
 
         as a default rule.
         """
-        if all(a is b for a, b in zip(o.ufl_operands, ops)):
-            return o
-        else:
-            return o._ufl_expr_reconstruct_(*ops)
+        for a, b in zip(o.ufl_operands, ops):
+            if a is not b:
+                return o._ufl_expr_reconstruct_(*ops)
+        return o
 
     # Set default behaviour for any UFLType as undefined
     ufl_type = undefined